@@ -1,5 +1,12 @@
 from dataclasses import dataclass, field
-from typing import List, Optional, Tuple, TypedDict
+from typing import List, Optional, Protocol, Sequence, Tuple, TypedDict
+
+
+class Tokenizer(Protocol):
+    # Satisfied by tiktoken.Encoding, among others.
+    def encode(self, text: str) -> List[int]: ...
+
+    def decode(self, tokens: Sequence[int]) -> str: ...
 
 
 @dataclass
@@ -8,6 +15,12 @@ class ModelConfig:
     supported_models: List[str] = field(default_factory=list)
     max_response_tokens: int = 4096
     temperature: float = 0.5
+    # Overrides the known context window of the model family when set.
+    context_window: Optional[int] = None
+    # Truncate prompts that overflow the context window instead of raising.
+    truncate_prompt: bool = False
+    # Counts prompt tokens exactly, otherwise a heuristic estimate is used.
+    tokenizer: Optional[Tokenizer] = None
 
 
 class ProviderConfigs(TypedDict, total=False):
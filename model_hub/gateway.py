@@ -0,0 +1,449 @@
+# gateway.py
+import argparse
+import asyncio
+import json
+import os
+import socket
+import stat
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from model_hub.config import ModelConfig, ProviderConfigs
+from model_hub.prompter import Prompter
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Threads for prompt fitting, kept apart so it never queues behind upstream calls.
+_FIT_WORKERS = 4
+
+# Single request or response frame is one line of JSON.
+_STREAM_LIMIT = 64 * 1024 * 1024
+
+
+class RateLimiter:
+    """
+    Token bucket limiting how many units per minute may go upstream.
+
+    Units are requests or, when budgeting a token quota, prompt tokens.
+    """
+
+    def __init__(self, units_per_minute: float, burst: Optional[int] = None):
+        if units_per_minute <= 0:
+            raise ValueError("units_per_minute must be greater than zero.")
+        self._rate = units_per_minute / 60.0
+        self._capacity = float(burst if burst is not None else max(1, int(self._rate)))
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self._capacity, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+    async def acquire(self, amount: float = 1) -> None:
+        # Requests larger than the bucket would never fit, so take a full bucket.
+        amount = min(amount, self._capacity)
+        # Holding the lock while sleeping keeps waiters strictly FIFO.
+        async with self._lock:
+            self._refill()
+            while self._tokens < amount:
+                await asyncio.sleep((amount - self._tokens) / self._rate)
+                self._refill()
+            self._tokens -= amount
+
+
+class ResponseCache:
+    """
+    Least recently used cache of responses keyed by (model, prompt).
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self._max_size = max_size
+        self._entries: OrderedDict[Tuple[str, str], str] = OrderedDict()
+
+    def get(self, model: str, prompt: str) -> Optional[str]:
+        key = (model, prompt)
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, model: str, prompt: str, response: str) -> None:
+        if self._max_size <= 0:
+            return
+        key = (model, prompt)
+        self._entries[key] = response
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class Gateway:
+    """
+    Serves a single shared Prompter to many local worker processes.
+
+    Every worker talks to the gateway instead of the providers directly, so
+    rate limits, the response cache, the model lists and the upstream HTTP
+    connections are shared by all of them.
+    """
+
+    def __init__(
+        self,
+        prompter: Prompter,
+        requests_per_minute: Optional[float] = None,
+        cache_size: int = 0,
+        max_concurrency: int = 32,
+        tokens_per_minute: Optional[float] = None,
+    ):
+        """
+        Args:
+            prompter: The Prompter used for every upstream request
+            requests_per_minute: Per model upstream request limit, unlimited if None
+            tokens_per_minute: Per model upstream token limit, counting each prompt
+                and its max_response_tokens, unlimited if None
+            cache_size: Maximum number of cached responses, 0 disables caching.
+                Cached prompts always get the same completion, even when sampled.
+            max_concurrency: Maximum number of upstream requests in flight, each
+                on its own thread
+        """
+        self._prompter = prompter
+        self._requests_per_minute = requests_per_minute
+        self._tokens_per_minute = tokens_per_minute
+        self._rate_limiters: Dict[str, RateLimiter] = {}
+        self._token_limiters: Dict[str, RateLimiter] = {}
+        self._cache = ResponseCache(cache_size)
+        self._in_flight: Dict[Tuple[str, str], "asyncio.Task[str]"] = {}
+        # Own pools so concurrency is set by max_concurrency, not the loop default.
+        self._upstream_executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="model-hub-upstream"
+        )
+        self._fit_executor = ThreadPoolExecutor(
+            max_workers=_FIT_WORKERS, thread_name_prefix="model-hub-fit"
+        )
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def _get_rate_limiter(self, model: str) -> Optional[RateLimiter]:
+        if self._requests_per_minute is None:
+            return None
+        if model not in self._rate_limiters:
+            self._rate_limiters[model] = RateLimiter(self._requests_per_minute)
+        return self._rate_limiters[model]
+
+    def _get_token_limiter(self, model: str) -> Optional[RateLimiter]:
+        if self._tokens_per_minute is None:
+            return None
+        if model not in self._token_limiters:
+            # Allow a full minute of tokens in one burst, as provider quotas do.
+            self._token_limiters[model] = RateLimiter(
+                self._tokens_per_minute, burst=int(self._tokens_per_minute)
+            )
+        return self._token_limiters[model]
+
+    async def _request_upstream(self, prompt: str, model: str) -> str:
+        loop = asyncio.get_running_loop()
+        # Fit the prompt first so oversized prompts fail before waiting on limits.
+        fitted = await loop.run_in_executor(
+            self._fit_executor, self._prompter.fit_prompt, prompt, model
+        )
+        rate_limiter = self._get_rate_limiter(model)
+        if rate_limiter is not None:
+            await rate_limiter.acquire()
+        token_limiter = self._get_token_limiter(model)
+        if token_limiter is not None:
+            # Provider quotas count the reserved response tokens too.
+            await token_limiter.acquire(fitted.total_tokens)
+        return await loop.run_in_executor(
+            self._upstream_executor,
+            self._prompter.send,
+            fitted.prompt,
+            model,
+            fitted.prompt_tokens,
+        )
+
+    def close(self) -> None:
+        """
+        Shut down the worker threads once the server has stopped.
+        """
+        self._upstream_executor.shutdown(wait=False, cancel_futures=True)
+        self._fit_executor.shutdown(wait=False, cancel_futures=True)
+
+    async def send(self, prompt: str, model: Optional[str] = None) -> str:
+        """
+        Send a prompt through the shared cache, rate limiter and Prompter.
+
+        Identical requests already in flight are coalesced into one upstream call.
+
+        Raises:
+            ValueError: If no model is given and the Prompter has no default model
+        """
+        if model is None:
+            model = self._prompter.get_default_model()
+        if model is None:
+            raise ValueError(
+                "Gateway request model and Prompter default_model both None. "
+                "Atleast one must be defined."
+            )
+
+        cached = self._cache.get(model, prompt)
+        if cached is not None:
+            return cached
+
+        key = (model, prompt)
+        task = self._in_flight.get(key)
+        if task is None:
+            # The upstream call runs as its own task so cancelling one caller
+            # does not cancel it for the others waiting on the same result.
+            task = asyncio.create_task(self._request_upstream(prompt, model))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish_request(key, done))
+        return await asyncio.shield(task)
+
+    def _finish_request(self, key: Tuple[str, str], task: "asyncio.Task[str]") -> None:
+        del self._in_flight[key]
+        # Retrieving the exception also stops an unawaited failure being logged.
+        if task.cancelled() or task.exception() is not None:
+            return
+        model, prompt = key
+        self._cache.put(model, prompt, task.result())
+
+    async def _handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            prompt = request["prompt"]
+            model = request.get("model")
+            if not isinstance(prompt, str):
+                raise ValueError("Gateway request prompt must be a string.")
+            return {"response": await self.send(prompt, model)}
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            return {"error": f"{type(error).__name__}: {error}"}
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError as error:
+                    result: Dict[str, Any] = {"error": f"Invalid request: {error}"}
+                else:
+                    result = await self._handle_request(request)
+                writer.write(json.dumps(result).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(
+        self,
+        socket_path: Optional[str] = None,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+    ) -> asyncio.AbstractServer:
+        """
+        Start listening on a Unix socket if socket_path is given, else on host:port.
+        """
+        if socket_path is not None:
+            _remove_stale_socket(socket_path)
+            self._server = await asyncio.start_unix_server(
+                self._handle_connection, path=socket_path, limit=_STREAM_LIMIT
+            )
+        else:
+            self._server = await asyncio.start_server(
+                self._handle_connection, host=host, port=port, limit=_STREAM_LIMIT
+            )
+        return self._server
+
+    async def serve_forever(
+        self,
+        socket_path: Optional[str] = None,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+    ) -> None:
+        server = await self.start(socket_path, host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    """
+    Remove a socket left behind by a gateway that is no longer running.
+
+    Raises:
+        FileExistsError: If the path is not a socket or a gateway is listening on it
+    """
+    try:
+        mode = os.stat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{socket_path} exists and is not a socket.")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except ConnectionRefusedError:
+        os.remove(socket_path)
+        return
+    finally:
+        probe.close()
+    raise FileExistsError(f"A gateway is already listening on {socket_path}.")
+
+
+class GatewayClient:
+    """
+    Thin client for a running Gateway with the same send interface as Prompter.
+
+    The connection is opened lazily and reused between calls.
+    """
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        timeout: Optional[float] = None,
+    ):
+        self._socket_path = socket_path
+        self._host = host
+        self._port = port
+        self._timeout = timeout
+        self._socket: Optional[socket.socket] = None
+        self._reader: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> None:
+        if self._socket_path is not None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self._timeout)
+            sock.connect(self._socket_path)
+        else:
+            sock = socket.create_connection((self._host, self._port), self._timeout)
+        self._socket = sock
+        self._reader = sock.makefile("rb")
+
+    def close(self) -> None:
+        if self._reader is not None:
+            self._reader.close()
+        if self._socket is not None:
+            self._socket.close()
+        self._reader = None
+        self._socket = None
+
+    def send(self, prompt: str, model: Optional[str] = None) -> str:
+        """
+        Send a prompt to the gateway and wait for the model's response.
+
+        Raises:
+            ValueError: If the gateway failed to handle the request
+            ConnectionError: If the gateway closed the connection
+        """
+        payload = json.dumps({"prompt": prompt, "model": model}).encode() + b"\n"
+        with self._lock:
+            if self._socket is None:
+                self._connect()
+            assert self._socket is not None and self._reader is not None
+            try:
+                self._socket.sendall(payload)
+                line = self._reader.readline()
+            except OSError:
+                self.close()
+                raise
+            if not line:
+                self.close()
+                raise ConnectionError("Gateway closed the connection.")
+        result: Dict[str, Any] = json.loads(line)
+        if "error" in result:
+            raise ValueError(result["error"])
+        return str(result["response"])
+
+
+def _parse_models(value: Optional[str]) -> List[str]:
+    if not value:
+        return []
+    return [model.strip() for model in value.split(",") if model.strip()]
+
+
+def _provider_configs_from_env(args: argparse.Namespace) -> ProviderConfigs:
+    provider_configs: ProviderConfigs = {}
+    openai_key = os.getenv("OPENAI_API_KEY")
+    if openai_key:
+        provider_configs["openai"] = ModelConfig(
+            api_key=openai_key,
+            supported_models=_parse_models(args.openai_models),
+            max_response_tokens=args.max_response_tokens,
+            temperature=args.temperature,
+            context_window=args.context_window,
+            truncate_prompt=args.truncate_prompt,
+        )
+    gemini_key = os.getenv("GEMINI_API_KEY")
+    if gemini_key:
+        provider_configs["gemini"] = ModelConfig(
+            api_key=gemini_key,
+            supported_models=_parse_models(args.gemini_models),
+            max_response_tokens=args.max_response_tokens,
+            temperature=args.temperature,
+            context_window=args.context_window,
+            truncate_prompt=args.truncate_prompt,
+        )
+    return provider_configs
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m model_hub.gateway",
+        description="Serve a shared Prompter to local worker processes.",
+    )
+    parser.add_argument("--socket", help="Unix socket path, overrides host/port")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--default-model")
+    parser.add_argument("--openai-models", help="Comma separated model names")
+    parser.add_argument("--gemini-models", help="Comma separated model names")
+    parser.add_argument("--max-response-tokens", type=int, default=4096)
+    parser.add_argument("--temperature", type=float, default=0.5)
+    parser.add_argument("--context-window", type=int)
+    parser.add_argument("--truncate-prompt", action="store_true")
+    parser.add_argument("--requests-per-minute", type=float)
+    parser.add_argument("--tokens-per-minute", type=float)
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=0,
+        help="Number of responses to cache, off by default. Cached prompts "
+        "always get the same completion, even at a non-zero temperature.",
+    )
+    parser.add_argument("--max-concurrency", type=int, default=32)
+    args = parser.parse_args(argv)
+
+    prompter = Prompter(args.default_model, _provider_configs_from_env(args))
+    gateway = Gateway(
+        prompter,
+        requests_per_minute=args.requests_per_minute,
+        cache_size=args.cache_size,
+        max_concurrency=args.max_concurrency,
+        tokens_per_minute=args.tokens_per_minute,
+    )
+    try:
+        asyncio.run(gateway.serve_forever(args.socket, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
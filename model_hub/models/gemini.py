@@ -1,4 +1,5 @@
 import os
+import time
 from typing import List, Optional
 
 from google import genai
@@ -6,6 +7,7 @@ from google.genai import types
 
 from model_hub.config import ModelConfig
 from model_hub.models.model_abc import ModelName, ModelProviderABC
+from model_hub.response import ModelResponse
 
 
 class Gemini(ModelProviderABC):
@@ -17,17 +19,27 @@ class Gemini(ModelProviderABC):
     def get_name(self) -> ModelName:
         return ModelName.GEMINI
 
-    def request(self, prompt: str, model: str) -> str:
+    def request(self, prompt: str, model: str) -> ModelResponse:
         config: types.GenerateContentConfig = types.GenerateContentConfig(
             max_output_tokens=self._config.max_response_tokens,
             temperature=self._config.temperature,
         )
+        start = time.perf_counter()
         response: types.GenerateContentResponse = self._client.models.generate_content(
             model=model,
             contents=prompt,
             config=config,
         )
-        return response.text or ""
+        latency = time.perf_counter() - start
+        usage = response.usage_metadata
+        return ModelResponse(
+            text=response.text or "",
+            provider=self.get_name().value,
+            model=model,
+            input_tokens=usage.prompt_token_count if usage else None,
+            output_tokens=usage.candidates_token_count if usage else None,
+            latency=latency,
+        )
 
     def _get_models(self) -> List[str]:
         models_list: List[str] = []
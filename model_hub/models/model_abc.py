@@ -1,8 +1,16 @@
 import enum
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
 
 from model_hub.config import ModelConfig
+from model_hub.response import ModelResponse
+from model_hub.tokens import (
+    HEURISTIC_MARGIN,
+    FittedPrompt,
+    estimate_tokens,
+    get_context_window,
+    truncate_to_tokens,
+)
 
 
 class ModelName(enum.Enum):
@@ -18,10 +26,62 @@ class ModelProviderABC(ABC):
     def get_name(self) -> ModelName: ...
 
     @abstractmethod
-    def request(self, prompt: str, model: str) -> str: ...
+    def request(self, prompt: str, model: str) -> ModelResponse: ...
 
     @abstractmethod
     def get_all_models(self) -> List[str]: ...
 
     @abstractmethod
     def get_supported_models(self) -> List[str]: ...
+
+    def count_tokens(self, prompt: str, model: str) -> int:
+        return estimate_tokens(prompt, self._config.tokenizer)
+
+    def fit_prompt(
+        self, prompt: str, model: str, prompt_tokens: Optional[int] = None
+    ) -> FittedPrompt:
+        """
+        Check the prompt and max_response_tokens fit the model's context window.
+
+        Without a configured tokenizer the prompt size is only estimated, so
+        the prompt is let through unless the estimate is over budget by more
+        than HEURISTIC_MARGIN.
+
+        Args:
+            prompt: The text prompt to check
+            model: The model the prompt will be sent to
+            prompt_tokens: The prompt's size if already known, to avoid recounting
+
+        Returns:
+            The prompt, truncated if it overflows and truncate_prompt is set,
+            with its estimated size
+
+        Raises:
+            ValueError: If the prompt overflows the context window and cannot be
+                truncated to a non-empty prompt
+        """
+        max_response_tokens = self._config.max_response_tokens
+        if prompt_tokens is None:
+            prompt_tokens = self.count_tokens(prompt, model)
+        context_window = self._config.context_window or get_context_window(model)
+        if context_window is None:
+            return FittedPrompt(prompt, prompt_tokens, max_response_tokens)
+        prompt_budget = context_window - max_response_tokens
+        allowed_tokens = prompt_budget
+        if self._config.tokenizer is None:
+            allowed_tokens = int(prompt_budget * (1 + HEURISTIC_MARGIN))
+        if prompt_tokens <= allowed_tokens:
+            return FittedPrompt(prompt, prompt_tokens, max_response_tokens)
+        if self._config.truncate_prompt and prompt_budget > 0:
+            truncated = truncate_to_tokens(
+                prompt, prompt_budget, self._config.tokenizer
+            )
+            if truncated:
+                return FittedPrompt(
+                    truncated, self.count_tokens(truncated, model), max_response_tokens
+                )
+        raise ValueError(
+            f"Prompt of ~{prompt_tokens} tokens plus max_response_tokens of "
+            f"{self._config.max_response_tokens} exceeds the {context_window} "
+            f"token context window of {model}"
+        )
@@ -1,3 +1,4 @@
+import time
 from typing import List, Optional
 
 import openai
@@ -5,6 +6,7 @@ from openai.types.responses.response import Response
 
 from model_hub.config import ModelConfig
 from model_hub.models.model_abc import ModelName, ModelProviderABC
+from model_hub.response import ModelResponse
 
 
 class OpenAi(ModelProviderABC):
@@ -16,14 +18,24 @@ class OpenAi(ModelProviderABC):
     def get_name(self) -> ModelName:
         return ModelName.OPENAI
 
-    def request(self, prompt: str, model: str) -> str:
+    def request(self, prompt: str, model: str) -> ModelResponse:
+        start = time.perf_counter()
         response: Response = self._client.responses.create(
             model=model,
             input=prompt,
             temperature=self._config.temperature,
             max_output_tokens=self._config.max_response_tokens,
         )
-        return response.output_text
+        latency = time.perf_counter() - start
+        usage = response.usage
+        return ModelResponse(
+            text=response.output_text,
+            provider=self.get_name().value,
+            model=model,
+            input_tokens=usage.input_tokens if usage else None,
+            output_tokens=usage.output_tokens if usage else None,
+            latency=latency,
+        )
 
     def _get_models(self) -> List[str]:
         return [item.id for item in self._client.models.list()]
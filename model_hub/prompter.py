@@ -1,5 +1,5 @@
 # prompter.py
-from typing import Dict, List, Optional, Tuple, Type, cast
+from typing import Dict, Iterable, List, Optional, Tuple, Type, cast
 
 # from model_hub.models import openai as openai_prompter
 from model_hub.config import ModelConfig, ProviderConfigs
@@ -8,6 +8,8 @@ from model_hub.config import ModelConfig, ProviderConfigs
 from model_hub.models.gemini import Gemini
 from model_hub.models.model_abc import ModelName, ModelProviderABC
 from model_hub.models.openai import OpenAi
+from model_hub.response import ModelResponse, ResponseCollector
+from model_hub.tokens import FittedPrompt
 
 # Define type for provider map
 ProviderMap = Dict[str, Type[ModelProviderABC]]
@@ -107,7 +109,15 @@ class Prompter:
     def set_default_model(self, model: str) -> None:
         self._default_model = model
 
-    def send(self, prompt: str, model: Optional[str] = None) -> str:
+    def get_default_model(self) -> Optional[str]:
+        return self._default_model
+
+    def send(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        prompt_tokens: Optional[int] = None,
+    ) -> str:
         """
         Send a prompt to the appropriate model provider based on the requested model.
 
@@ -116,17 +126,93 @@ class Prompter:
         2. Has the requested model in its list of supported models
         3. Has the requested model in its list of available models
 
+        The prompt is checked against the model's context window before it is
+        sent, and truncated or rejected if it would overflow.
+
         Args:
             prompt: The text prompt to send to the model
             model: The specific model name to use
+            prompt_tokens: The prompt's size if already known, to avoid recounting
 
         Returns:
             The model's response as a string
 
+        Raises:
+            ValueError: If no provider supports the requested model,
+                    if a provider is improperly initialized
+                    or if the prompt overflows the context window
+        """
+        return self.request(prompt, model, prompt_tokens).text
+
+    def request(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        prompt_tokens: Optional[int] = None,
+    ) -> ModelResponse:
+        """
+        Send a prompt like send, returning the response with its usage and latency.
+
+        Raises:
+            ValueError: If no provider supports the requested model
+                    or if the prompt overflows the context window
+        """
+        provider, model = self._get_provider(model)
+        fitted = provider.fit_prompt(prompt, model, prompt_tokens)
+        return provider.request(fitted.prompt, model)
+
+    def request_batch(
+        self, prompts: Iterable[str], model: Optional[str] = None
+    ) -> ResponseCollector:
+        """
+        Send each prompt in turn, collecting the responses in columnar form.
+
+        A prompt that fails, e.g. because it overflows the context window or the
+        provider returns an error, does not stop the batch. It is recorded as an
+        empty response whose error is available from the collector's error and
+        failed_indexes, so rows always line up with prompts.
+
+        Raises:
+            ValueError: If no provider supports the requested model
+        """
+        provider, model = self._get_provider(model)
+        collector = ResponseCollector()
+        for prompt in prompts:
+            try:
+                response = self.request(prompt, model)
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                collector.append_error(
+                    provider.get_name().value, model, f"{type(error).__name__}: {error}"
+                )
+            else:
+                collector.append(response)
+        return collector
+
+    def count_tokens(self, prompt: str, model: Optional[str] = None) -> int:
+        """
+        Estimate the prompt size in tokens for the provider serving the model.
+
         Raises:
             ValueError: If no provider supports the requested model
-                    or if a provider is improperly initialized
         """
+        provider, model = self._get_provider(model)
+        return provider.count_tokens(prompt, model)
+
+    def fit_prompt(self, prompt: str, model: Optional[str] = None) -> FittedPrompt:
+        """
+        Check the prompt fits the context window of the model without sending it.
+
+        Returns:
+            The prompt, truncated if needed, with its size and max_response_tokens
+
+        Raises:
+            ValueError: If no provider supports the requested model
+                    or if the prompt overflows the context window
+        """
+        provider, model = self._get_provider(model)
+        return provider.fit_prompt(prompt, model)
+
+    def _get_provider(self, model: Optional[str]) -> Tuple[ModelProviderABC, str]:
         if self._default_model is None and model is None:
             raise ValueError(
                 "Prompter default_model and model arg both None. Atleast one must be defined."
@@ -134,6 +220,7 @@ class Prompter:
 
         if model is None:
             model = self._default_model
+        assert model is not None
 
         for provider in self._model_providers:
             if provider is None:
@@ -142,5 +229,5 @@ class Prompter:
                 continue
             if model not in provider.get_all_models():
                 continue
-            return provider.request(prompt, model)
+            return provider, model
         raise ValueError(f"Model - {model} - not supported by any providers")
@@ -0,0 +1,285 @@
+# response.py
+import json
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Marks a missing token count in the integer usage columns.
+_MISSING = -1
+
+_MAGIC = b"MHRC"
+_VERSION = 1
+
+
+@dataclass(slots=True)
+class ModelResponse:
+    text: str
+    provider: str
+    model: str
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+    latency: float = 0.0
+
+
+class ResponseCollector:
+    """
+    Columnar store for large batches of model responses.
+
+    All response text lives in one contiguous UTF-8 buffer indexed by offsets,
+    providers and models are dictionary encoded, and usage and latency are
+    packed into typed arrays, so each stored response costs a few bytes of
+    overhead instead of several Python objects. Buffers are written to disk
+    as they are, without copying individual responses.
+    """
+
+    def __init__(self) -> None:
+        self._text = bytearray()
+        self._offsets = array("q", [0])
+        self._names: List[str] = []
+        self._name_indexes: Dict[str, int] = {}
+        self._providers = array("i")
+        self._models = array("i")
+        self._input_tokens = array("q")
+        self._output_tokens = array("q")
+        self._latencies = array("d")
+        # Sparse, failures are expected to be rare compared to responses.
+        self._errors: Dict[int, str] = {}
+
+    def _columns(self) -> List[Tuple[str, "array[Any]"]]:
+        return [
+            ("offsets", self._offsets),
+            ("providers", self._providers),
+            ("models", self._models),
+            ("input_tokens", self._input_tokens),
+            ("output_tokens", self._output_tokens),
+            ("latencies", self._latencies),
+        ]
+
+    def _name_index(self, name: str) -> int:
+        index = self._name_indexes.get(name)
+        if index is None:
+            index = len(self._names)
+            self._names.append(name)
+            self._name_indexes[name] = index
+        return index
+
+    def append(self, response: ModelResponse) -> None:
+        self._text += response.text.encode()
+        self._offsets.append(len(self._text))
+        self._providers.append(self._name_index(response.provider))
+        self._models.append(self._name_index(response.model))
+        self._input_tokens.append(
+            _MISSING if response.input_tokens is None else response.input_tokens
+        )
+        self._output_tokens.append(
+            _MISSING if response.output_tokens is None else response.output_tokens
+        )
+        self._latencies.append(response.latency)
+
+    def append_error(self, provider: str, model: str, error: str) -> None:
+        """
+        Record a failed request as an empty response so rows stay aligned with prompts.
+        """
+        self._errors[len(self)] = error
+        self.append(ModelResponse("", provider, model))
+
+    def error(self, index: int) -> Optional[str]:
+        """
+        Return the error recorded for a failed request, or None if it succeeded.
+        """
+        return self._errors.get(self._check_index(index))
+
+    def failed_indexes(self) -> List[int]:
+        return sorted(self._errors)
+
+    def extend(self, responses: Iterable[ModelResponse]) -> None:
+        for response in responses:
+            self.append(response)
+
+    def __len__(self) -> int:
+        return len(self._latencies)
+
+    def _check_index(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ResponseCollector index out of range")
+        return index
+
+    def text_view(self, index: int) -> memoryview:
+        """
+        Return the UTF-8 bytes of a response's text without copying them.
+
+        The collector cannot grow while a view is held, so release it before
+        appending more responses.
+        """
+        index = self._check_index(index)
+        return memoryview(self._text)[self._offsets[index] : self._offsets[index + 1]]
+
+    def text(self, index: int) -> str:
+        return str(self.text_view(index), "utf-8")
+
+    def __getitem__(self, index: int) -> ModelResponse:
+        index = self._check_index(index)
+        input_tokens = self._input_tokens[index]
+        output_tokens = self._output_tokens[index]
+        return ModelResponse(
+            text=self.text(index),
+            provider=self._names[self._providers[index]],
+            model=self._names[self._models[index]],
+            input_tokens=None if input_tokens == _MISSING else input_tokens,
+            output_tokens=None if output_tokens == _MISSING else output_tokens,
+            latency=self._latencies[index],
+        )
+
+    def __iter__(self) -> Iterator[ModelResponse]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def total_tokens(self) -> Tuple[int, int]:
+        """
+        Return the summed (input, output) token counts, skipping missing counts.
+        """
+        return (
+            sum(count for count in self._input_tokens if count != _MISSING),
+            sum(count for count in self._output_tokens if count != _MISSING),
+        )
+
+    def write(self, file: BinaryIO) -> None:
+        """
+        Write all responses to a binary file.
+
+        The file holds a JSON header line followed by each column buffer and
+        finally the text buffer, in native byte order.
+        """
+        columns = self._columns()
+        header = {
+            "version": _VERSION,
+            "count": len(self),
+            "byteorder": sys.byteorder,
+            "names": self._names,
+            "columns": [
+                [name, column.typecode, column.itemsize, len(column)]
+                for name, column in columns
+            ],
+            "text_size": len(self._text),
+            "errors": [[index, error] for index, error in sorted(self._errors.items())],
+        }
+        file.write(_MAGIC)
+        file.write(json.dumps(header).encode() + b"\n")
+        for _, column in columns:
+            file.write(memoryview(column).cast("B"))
+        file.write(self._text)
+
+    @classmethod
+    def read(cls, file: BinaryIO) -> "ResponseCollector":
+        """
+        Read responses previously written with write.
+
+        Raises:
+            ValueError: If the file was not written by a ResponseCollector,
+                    or is truncated or corrupt
+        """
+        if file.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError("File is not a ResponseCollector file.")
+        header = _read_header(file)
+        count = header["count"]
+
+        collector = cls()
+        collector._names = header["names"]
+        collector._name_indexes = {
+            name: index for index, name in enumerate(collector._names)
+        }
+        columns = dict(collector._columns())
+        if sorted(name for name, *_ in header["columns"]) != sorted(columns):
+            raise ValueError(
+                "ResponseCollector file does not have the expected columns."
+            )
+        for column_header in header["columns"]:
+            name, _, itemsize, length = column_header
+            column = columns[name]
+            _check_column(column, column_header, count)
+            del column[:]
+            column.frombytes(_read_exactly(file, itemsize * length))
+            if header["byteorder"] != sys.byteorder:
+                column.byteswap()
+        collector._text = bytearray(header["text_size"])
+        _readinto_exactly(file, collector._text)
+        collector._errors = header["errors"]
+        collector._check_consistency()
+        return collector
+
+    def _check_consistency(self) -> None:
+        count = len(self)
+        offsets = self._offsets
+        if offsets[0] != 0 or offsets[-1] != len(self._text):
+            raise ValueError("ResponseCollector offsets do not match the text buffer.")
+        if any(offsets[index] > offsets[index + 1] for index in range(count)):
+            raise ValueError("ResponseCollector offsets are not in order.")
+        for column in (self._providers, self._models):
+            if count and not 0 <= min(column) <= max(column) < len(self._names):
+                raise ValueError("ResponseCollector name index out of range.")
+        if any(not 0 <= index < count for index in self._errors):
+            raise ValueError("ResponseCollector error index out of range.")
+
+
+def _read_header(file: BinaryIO) -> Dict[str, Any]:
+    try:
+        header = json.loads(file.readline())
+        version = header["version"]
+        if version != _VERSION:
+            raise ValueError(f"Unsupported ResponseCollector file version {version}.")
+        byteorder = header["byteorder"]
+        if byteorder not in ("little", "big"):
+            raise ValueError(f"Unsupported ResponseCollector byte order {byteorder}.")
+        return {
+            "count": int(header["count"]),
+            "byteorder": byteorder,
+            "text_size": int(header["text_size"]),
+            "names": [str(name) for name in header["names"]],
+            "columns": [
+                (str(name), str(typecode), int(itemsize), int(length))
+                for name, typecode, itemsize, length in header["columns"]
+            ],
+            "errors": {int(index): str(error) for index, error in header["errors"]},
+        }
+    except (KeyError, TypeError, ValueError) as error:
+        raise ValueError(f"Corrupt ResponseCollector file header: {error}") from error
+
+
+def _check_column(
+    column: "array[Any]", column_header: Tuple[str, str, int, int], count: int
+) -> None:
+    name, typecode, itemsize, length = column_header
+    if column.typecode != typecode or column.itemsize != itemsize:
+        raise ValueError(f"Incompatible {name} column in ResponseCollector file.")
+    expected_length = count + 1 if name == "offsets" else count
+    if length != expected_length:
+        raise ValueError(
+            f"ResponseCollector {name} column has {length} entries, "
+            f"expected {expected_length}."
+        )
+
+
+def _read_exactly(file: BinaryIO, size: int) -> bytes:
+    data = file.read(size)
+    if len(data) != size:
+        raise ValueError(
+            f"ResponseCollector file is truncated, expected {size} bytes "
+            f"but read {len(data)}."
+        )
+    return data
+
+
+def _readinto_exactly(file: BinaryIO, buffer: bytearray) -> None:
+    view = memoryview(buffer)
+    read = 0
+    while read < len(buffer):
+        chunk = file.readinto(view[read:])  # type: ignore[attr-defined]
+        if not chunk:
+            raise ValueError(
+                f"ResponseCollector file is truncated, expected {len(buffer)} bytes "
+                f"but read {read}."
+            )
+        read += chunk
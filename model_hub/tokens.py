@@ -0,0 +1,156 @@
+# tokens.py
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from model_hub.config import Tokenizer
+
+# Heuristic estimates may be this much over budget before a prompt is
+# rejected, so prompts that would fit are not refused on a rough count.
+HEURISTIC_MARGIN = 0.2
+
+
+@dataclass(slots=True)
+class FittedPrompt:
+    prompt: str
+    prompt_tokens: int
+    max_response_tokens: int
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.max_response_tokens
+
+
+# Exact model ids, for families whose variants have different windows.
+_CONTEXT_WINDOWS: Dict[str, int] = {
+    "gpt-4": 8192,
+    "gpt-4-0314": 8192,
+    "gpt-4-0613": 8192,
+    "gpt-4-32k": 32768,
+    "gpt-4-32k-0314": 32768,
+    "gpt-4-32k-0613": 32768,
+    "gpt-4-1106-preview": 128000,
+    "gpt-4-0125-preview": 128000,
+    "gpt-4-vision-preview": 128000,
+    "gpt-4-1106-vision-preview": 128000,
+    "gpt-3.5-turbo": 16385,
+    "gpt-3.5-turbo-0125": 16385,
+    "gpt-3.5-turbo-1106": 16385,
+    "gpt-3.5-turbo-16k": 16385,
+    "gpt-3.5-turbo-16k-0613": 16385,
+    "gpt-3.5-turbo-0301": 4096,
+    "gpt-3.5-turbo-0613": 4096,
+    "gpt-3.5-turbo-instruct": 4096,
+    "gpt-3.5-turbo-instruct-0914": 4096,
+}
+
+# Families whose every variant shares a window, matched as the whole id or
+# the family followed by "-". Sorted longest first so the most specific wins.
+_CONTEXT_WINDOW_FAMILIES: List[Tuple[str, int]] = sorted(
+    [
+        ("gpt-4.1", 1047576),
+        ("gpt-4.5", 128000),
+        ("gpt-4o", 128000),
+        ("gpt-4-turbo", 128000),
+        ("o1-mini", 128000),
+        ("o1-preview", 128000),
+        ("o1", 200000),
+        ("o3", 200000),
+        ("o4-mini", 200000),
+        ("gemini-1.5-pro", 2097152),
+        ("gemini-1.5-flash", 1048576),
+        ("gemini-2.0-flash", 1048576),
+        ("gemini-2.5", 1048576),
+    ],
+    key=lambda item: len(item[0]),
+    reverse=True,
+)
+
+# Rough BPE style pre-tokenization: words, short digit groups, punctuation runs
+# and whitespace, each optionally led by a single space like GPT tokenizers.
+_PIECE_PATTERN = re.compile(r" ?[^\W\d_]+| ?\d{1,3}| ?[^\w\s]+|\s+")
+
+# Han, kana and hangul, which BPE tokenizers split roughly a token per character.
+_CJK_PATTERN = re.compile(
+    "[\u1100-\u11ff\u3040-\u30ff\u3130-\u318f\u3400-\u4dbf\u4e00-\u9fff"
+    "\uac00-\ud7af\uf900-\ufaff\U00020000-\U0002ffff]"
+)
+
+# Average characters per token for the pieces matched above.
+_WORD_CHARS_PER_TOKEN = 5
+_PUNCTUATION_CHARS_PER_TOKEN = 2
+
+
+def get_context_window(model: str) -> Optional[int]:
+    """
+    Return the context window in tokens of a known model, else None.
+    """
+    if model in _CONTEXT_WINDOWS:
+        return _CONTEXT_WINDOWS[model]
+    for family, context_window in _CONTEXT_WINDOW_FAMILIES:
+        if model == family or model.startswith(family + "-"):
+            return context_window
+    return None
+
+
+def _count_piece(piece: str) -> int:
+    text = piece.strip()
+    if not text:
+        return 1 if piece else 0
+    if text[0].isdigit():
+        return 1
+    if not text[0].isalpha():
+        return math.ceil(len(text) / _PUNCTUATION_CHARS_PER_TOKEN)
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / _WORD_CHARS_PER_TOKEN)
+
+
+def _truncate_piece(piece: str, max_tokens: int) -> str:
+    # Longest prefix of a single piece within max_tokens, found by bisection
+    # since the cost of a prefix only grows with its length.
+    low, high = 0, len(piece)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if _count_piece(piece[:middle]) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return piece[:low]
+
+
+def estimate_tokens(text: str, tokenizer: Optional[Tokenizer] = None) -> int:
+    """
+    Estimate how many tokens a model will count for the given text.
+
+    Counts exactly with the tokenizer when one is given, otherwise uses a fast
+    offline heuristic.
+    """
+    if tokenizer is not None:
+        return len(tokenizer.encode(text))
+    return sum(_count_piece(match.group()) for match in _PIECE_PATTERN.finditer(text))
+
+
+def truncate_to_tokens(
+    text: str, max_tokens: int, tokenizer: Optional[Tokenizer] = None
+) -> str:
+    """
+    Return the longest prefix of text estimated to fit within max_tokens.
+    """
+    if max_tokens <= 0:
+        return ""
+    if tokenizer is not None:
+        tokens = tokenizer.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        return tokenizer.decode(tokens[:max_tokens])
+
+    count = 0
+    for match in _PIECE_PATTERN.finditer(text):
+        piece = match.group()
+        piece_tokens = _count_piece(piece)
+        if count + piece_tokens > max_tokens:
+            # Cut inside the piece, long CJK runs and identifiers are one piece.
+            return text[: match.start()] + _truncate_piece(piece, max_tokens - count)
+        count += piece_tokens
+    return text
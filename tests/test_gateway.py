@@ -0,0 +1,355 @@
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from model_hub.gateway import Gateway, GatewayClient, RateLimiter, ResponseCache
+from model_hub.tokens import FittedPrompt
+
+class TestResponseCache(unittest.TestCase):
+    def test_get_and_put(self):
+        """Test cached responses are returned per model and prompt."""
+        cache = ResponseCache(max_size=2)
+        cache.put("model1", "Hello", "Hi")
+        self.assertEqual(cache.get("model1", "Hello"), "Hi")
+        self.assertIsNone(cache.get("model2", "Hello"))
+
+    def test_evicts_least_recently_used(self):
+        """Test the least recently used entry is evicted when full."""
+        cache = ResponseCache(max_size=2)
+        cache.put("model", "a", "1")
+        cache.put("model", "b", "2")
+        cache.get("model", "a")
+        cache.put("model", "c", "3")
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("model", "a"), "1")
+        self.assertIsNone(cache.get("model", "b"))
+
+    def test_zero_size_disables_cache(self):
+        """Test a cache of size zero stores nothing."""
+        cache = ResponseCache(max_size=0)
+        cache.put("model", "a", "1")
+        self.assertIsNone(cache.get("model", "a"))
+
+class TestRateLimiter(unittest.TestCase):
+    def test_invalid_rate(self):
+        """Test a non-positive rate is rejected."""
+        with self.assertRaises(ValueError):
+            RateLimiter(0)
+
+    def test_waits_when_bucket_empty(self):
+        """Test acquire waits for a token once the burst is used up."""
+        async def acquire_twice():
+            limiter = RateLimiter(600, burst=1)
+            start = time.monotonic()
+            await limiter.acquire()
+            await limiter.acquire()
+            return time.monotonic() - start
+
+        elapsed = asyncio.run(acquire_twice())
+        self.assertGreaterEqual(elapsed, 0.09)
+
+    def test_acquire_amount(self):
+        """Test acquire takes the requested amount from the bucket."""
+        async def acquire_amounts():
+            limiter = RateLimiter(units_per_minute=6000, burst=100)
+            start = time.monotonic()
+            await limiter.acquire(100)
+            await limiter.acquire(10)
+            return time.monotonic() - start
+
+        elapsed = asyncio.run(acquire_amounts())
+        self.assertGreaterEqual(elapsed, 0.09)
+
+class TestGateway(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures."""
+        self.mock_prompter = MagicMock()
+        self.mock_prompter.get_default_model.return_value = "gemini-2.0-flash"
+        self.mock_prompter.send.side_effect = lambda prompt, model, prompt_tokens: f"{model}: {prompt}"
+        self.mock_prompter.fit_prompt.side_effect = lambda prompt, model: FittedPrompt(prompt, 10, 0)
+        self.gateway = Gateway(self.mock_prompter, cache_size=1024)
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        self.gateway.close()
+
+    def test_cache_disabled_by_default(self):
+        """Test repeated prompts go upstream unless caching is enabled."""
+        gateway = Gateway(self.mock_prompter)
+
+        async def send_twice():
+            await gateway.send("Hello, world!", "gpt-4o-mini")
+            await gateway.send("Hello, world!", "gpt-4o-mini")
+
+        asyncio.run(send_twice())
+        self.assertEqual(self.mock_prompter.send.call_count, 2)
+
+    def test_send_uses_default_model(self):
+        """Test send falls back to the Prompter default model."""
+        response = asyncio.run(self.gateway.send("Hello, world!"))
+
+        self.mock_prompter.send.assert_called_once_with("Hello, world!", "gemini-2.0-flash", 10)
+        self.assertEqual(response, "gemini-2.0-flash: Hello, world!")
+
+    def test_send_requires_model(self):
+        """Test send requires a model when the Prompter has no default."""
+        self.mock_prompter.get_default_model.return_value = None
+        with self.assertRaises(ValueError):
+            asyncio.run(self.gateway.send("Hello, world!"))
+
+    def test_send_caches_responses(self):
+        """Test repeated prompts are served from the cache."""
+        async def send_twice():
+            await self.gateway.send("Hello, world!", "gpt-4o-mini")
+            return await self.gateway.send("Hello, world!", "gpt-4o-mini")
+
+        response = asyncio.run(send_twice())
+
+        self.mock_prompter.send.assert_called_once_with("Hello, world!", "gpt-4o-mini", 10)
+        self.assertEqual(response, "gpt-4o-mini: Hello, world!")
+
+    def test_send_coalesces_in_flight_requests(self):
+        """Test identical concurrent requests share one upstream call."""
+        def slow_send(prompt, model, prompt_tokens):
+            time.sleep(0.05)
+            return f"{model}: {prompt}"
+        self.mock_prompter.send.side_effect = slow_send
+        gateway = Gateway(self.mock_prompter, cache_size=0)
+
+        async def send_concurrently():
+            return await asyncio.gather(
+                *[gateway.send("Hello, world!", "gpt-4o-mini") for _ in range(5)]
+            )
+
+        responses = asyncio.run(send_concurrently())
+
+        self.mock_prompter.send.assert_called_once()
+        self.assertEqual(responses, ["gpt-4o-mini: Hello, world!"] * 5)
+
+    def test_cancelled_caller_does_not_strand_others(self):
+        """Test cancelling the first caller still resolves coalesced callers."""
+        def slow_send(prompt, model, prompt_tokens):
+            time.sleep(0.05)
+            return f"{model}: {prompt}"
+        self.mock_prompter.send.side_effect = slow_send
+
+        async def cancel_leader():
+            leader = asyncio.create_task(self.gateway.send("Hello, world!", "gpt-4o-mini"))
+            await asyncio.sleep(0)
+            follower = asyncio.create_task(self.gateway.send("Hello, world!", "gpt-4o-mini"))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await asyncio.wait_for(follower, timeout=5)
+
+        response = asyncio.run(cancel_leader())
+
+        self.assertEqual(response, "gpt-4o-mini: Hello, world!")
+        self.mock_prompter.send.assert_called_once()
+
+    def test_send_budgets_prompt_and_response_tokens(self):
+        """Test the token limit charges the fitted prompt plus max_response_tokens."""
+        self.mock_prompter.fit_prompt.side_effect = lambda prompt, model: FittedPrompt(prompt, 40, 20)
+        gateway = Gateway(self.mock_prompter, tokens_per_minute=6000)
+
+        async def send_twice():
+            gateway._token_limiters["gpt-4o-mini"] = RateLimiter(6000, burst=100)
+            start = time.monotonic()
+            await gateway.send("First", "gpt-4o-mini")
+            await gateway.send("Second", "gpt-4o-mini")
+            return time.monotonic() - start
+
+        elapsed = asyncio.run(send_twice())
+
+        self.mock_prompter.send.assert_any_call("First", "gpt-4o-mini", 40)
+        self.mock_prompter.count_tokens.assert_not_called()
+        self.assertEqual(self.mock_prompter.send.call_count, 2)
+        self.assertGreaterEqual(elapsed, 0.15)
+
+    def test_oversized_prompt_fails_before_limits(self):
+        """Test a prompt that cannot fit fails without waiting on the token budget."""
+        self.mock_prompter.fit_prompt.side_effect = ValueError("Prompt too large")
+        gateway = Gateway(self.mock_prompter, tokens_per_minute=60)
+
+        async def send_oversized():
+            limiter = RateLimiter(60, burst=60)
+            await limiter.acquire(60)
+            gateway._token_limiters["gpt-4o-mini"] = limiter
+            start = time.monotonic()
+            with self.assertRaises(ValueError):
+                await gateway.send("Hello, world!", "gpt-4o-mini")
+            return time.monotonic() - start
+
+        elapsed = asyncio.run(send_oversized())
+
+        self.assertLess(elapsed, 0.5)
+        self.mock_prompter.send.assert_not_called()
+
+    def test_upstream_concurrency_follows_max_concurrency(self):
+        """Test upstream calls are not capped by the event loop's default executor."""
+        lock = threading.Lock()
+        active = [0]
+        peak = [0]
+
+        def slow_send(prompt, model, prompt_tokens):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.2)
+            with lock:
+                active[0] -= 1
+            return prompt
+
+        self.mock_prompter.send.side_effect = slow_send
+        # More than the default executor's min(32, cpu_count + 4) threads.
+        gateway = Gateway(self.mock_prompter, max_concurrency=40)
+
+        async def send_concurrently():
+            return await asyncio.gather(
+                *[gateway.send(f"Prompt {index}", "gpt-4o-mini") for index in range(40)]
+            )
+
+        try:
+            asyncio.run(send_concurrently())
+        finally:
+            gateway.close()
+
+        self.assertEqual(peak[0], 40)
+
+    def test_upstream_concurrency_is_limited(self):
+        """Test no more than max_concurrency upstream calls run at once."""
+        lock = threading.Lock()
+        active = [0]
+        peak = [0]
+
+        def slow_send(prompt, model, prompt_tokens):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+            return prompt
+
+        self.mock_prompter.send.side_effect = slow_send
+        gateway = Gateway(self.mock_prompter, max_concurrency=3)
+
+        async def send_concurrently():
+            return await asyncio.gather(
+                *[gateway.send(f"Prompt {index}", "gpt-4o-mini") for index in range(10)]
+            )
+
+        try:
+            asyncio.run(send_concurrently())
+        finally:
+            gateway.close()
+
+        self.assertEqual(peak[0], 3)
+
+    def test_send_does_not_cache_errors(self):
+        """Test failed requests are retried rather than cached."""
+        self.mock_prompter.send.side_effect = ValueError("Model not supported")
+
+        with self.assertRaises(ValueError):
+            asyncio.run(self.gateway.send("Hello, world!", "unsupported-model"))
+        with self.assertRaises(ValueError):
+            asyncio.run(self.gateway.send("Hello, world!", "unsupported-model"))
+        self.assertEqual(self.mock_prompter.send.call_count, 2)
+
+class TestGatewayClient(unittest.TestCase):
+    def setUp(self):
+        """Start a gateway on a Unix socket in a background thread."""
+        self.mock_prompter = MagicMock()
+        self.mock_prompter.get_default_model.return_value = "gemini-2.0-flash"
+        self.mock_prompter.send.side_effect = lambda prompt, model, prompt_tokens: f"{model}: {prompt}"
+        self.mock_prompter.fit_prompt.side_effect = lambda prompt, model: FittedPrompt(prompt, 10, 0)
+        self.gateway = Gateway(self.mock_prompter)
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.temp_dir.name, "gateway.sock")
+
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.server = self.loop.run_until_complete(self.gateway.start(self.socket_path))
+            started.set()
+            self.loop.run_forever()
+
+        self.thread = threading.Thread(target=run, daemon=True)
+        self.thread.start()
+        started.wait(timeout=5)
+
+        self.client = GatewayClient(socket_path=self.socket_path, timeout=5)
+
+    def tearDown(self):
+        """Stop the gateway and close the client."""
+        self.client.close()
+
+        async def stop():
+            self.server.close()
+            await self.server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(stop(), self.loop).result(timeout=5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+        self.loop.close()
+        self.temp_dir.cleanup()
+
+    def test_start_refuses_live_socket(self):
+        """Test a second gateway does not take over a socket in use."""
+        with self.assertRaises(FileExistsError):
+            asyncio.run(Gateway(self.mock_prompter).start(self.socket_path))
+        self.assertEqual(self.client.send("Hello, world!"), "gemini-2.0-flash: Hello, world!")
+
+    def test_start_refuses_regular_file(self):
+        """Test a regular file at the socket path is never removed."""
+        path = os.path.join(self.temp_dir.name, "not-a-socket")
+        with open(path, "w") as file:
+            file.write("data")
+        with self.assertRaises(FileExistsError):
+            asyncio.run(Gateway(self.mock_prompter).start(path))
+        self.assertTrue(os.path.exists(path))
+
+    def test_start_replaces_stale_socket(self):
+        """Test a socket nobody is listening on is replaced."""
+        path = os.path.join(self.temp_dir.name, "stale.sock")
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()
+
+        async def start_and_stop():
+            server = await Gateway(self.mock_prompter).start(path)
+            server.close()
+            await server.wait_closed()
+
+        asyncio.run(start_and_stop())
+
+    def test_send(self):
+        """Test the client sends prompts through the gateway."""
+        self.assertEqual(self.client.send("Hello, world!"), "gemini-2.0-flash: Hello, world!")
+        self.assertEqual(
+            self.client.send("Hello, world!", "gpt-4o-mini"), "gpt-4o-mini: Hello, world!"
+        )
+
+    def test_send_reuses_connection(self):
+        """Test the client keeps one connection open between calls."""
+        self.client.send("First")
+        sock = self.client._socket
+        self.client.send("Second")
+        self.assertIs(self.client._socket, sock)
+
+    def test_send_raises_gateway_errors(self):
+        """Test errors raised in the gateway are surfaced by the client."""
+        self.mock_prompter.send.side_effect = ValueError("Model - bad - not supported by any providers")
+        with self.assertRaises(ValueError) as context:
+            self.client.send("Hello, world!", "bad")
+        self.assertIn("not supported", str(context.exception))
+
+if __name__ == "__main__":
+    unittest.main()
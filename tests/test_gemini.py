@@ -34,6 +34,8 @@ class TestGemini(unittest.TestCase):
         # Mock response
         self.mock_response = MagicMock()
         self.mock_response.text = "This is a mock response"
+        self.mock_response.usage_metadata.prompt_token_count = 4
+        self.mock_response.usage_metadata.candidates_token_count = 5
         self.mock_client.models.generate_content.return_value = self.mock_response
         
         # Initialize the Gemini provider
@@ -81,7 +83,12 @@ class TestGemini(unittest.TestCase):
         self.assertEqual(call_args["config"].max_output_tokens, 4096)
         self.assertEqual(call_args["config"].temperature, 0.5)
         
-        self.assertEqual(response, "This is a mock response")
+        self.assertEqual(response.text, "This is a mock response")
+        self.assertEqual(response.provider, "gemini")
+        self.assertEqual(response.model, "gemini-2.0-flash")
+        self.assertEqual(response.input_tokens, 4)
+        self.assertEqual(response.output_tokens, 5)
+        self.assertGreaterEqual(response.latency, 0)
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
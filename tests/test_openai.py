@@ -32,6 +32,8 @@ class TestOpenAI(unittest.TestCase):
         # Mock response
         self.mock_response = MagicMock()
         self.mock_response.output_text = "This is a mock OpenAI response"
+        self.mock_response.usage.input_tokens = 8
+        self.mock_response.usage.output_tokens = 7
         self.mock_client.responses.create.return_value = self.mock_response
         
         # Initialize the OpenAI provider
@@ -79,7 +81,12 @@ class TestOpenAI(unittest.TestCase):
         self.assertEqual(call_args["temperature"], 0.5)
         self.assertEqual(call_args["max_output_tokens"], 4096)
         
-        self.assertEqual(response, "This is a mock OpenAI response")
+        self.assertEqual(response.text, "This is a mock OpenAI response")
+        self.assertEqual(response.provider, "openai")
+        self.assertEqual(response.model, "gpt-4o-mini")
+        self.assertEqual(response.input_tokens, 8)
+        self.assertEqual(response.output_tokens, 7)
+        self.assertGreaterEqual(response.latency, 0)
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -4,6 +4,8 @@ from typing import List, Optional
 from model_hub.prompter import Prompter
 from model_hub.config import ModelConfig, ProviderConfigs
 from model_hub.models.model_abc import ModelName, ModelProviderABC
+from model_hub.response import ModelResponse, ResponseCollector
+from model_hub.tokens import FittedPrompt
 
 class MockProvider(ModelProviderABC):
     def __init__(self, config: ModelConfig, name: ModelName, all_models: List[str]):
@@ -47,12 +49,22 @@ class TestPrompter(unittest.TestCase):
         self.mock_gemini_provider.get_name.return_value = ModelName.GEMINI
         self.mock_gemini_provider.get_all_models.return_value = ["gemini-2.0-flash", "gemini-1.5-pro"]
         self.mock_gemini_provider.get_supported_models.return_value = ["gemini-2.0-flash"]
-        self.mock_gemini_provider.request.return_value = "Mock Gemini response"
+        self.mock_gemini_provider.request.return_value = ModelResponse(
+            "Mock Gemini response", "gemini", "gemini-2.0-flash", 3, 4, 0.1
+        )
+        self.mock_gemini_provider.fit_prompt.side_effect = (
+            lambda prompt, model, prompt_tokens: FittedPrompt(prompt, 3, 4096)
+        )
         
         self.mock_openai_provider.get_name.return_value = ModelName.OPENAI
         self.mock_openai_provider.get_all_models.return_value = ["gpt-4o-mini", "gpt-4"]
         self.mock_openai_provider.get_supported_models.return_value = ["gpt-4o-mini"]
-        self.mock_openai_provider.request.return_value = "Mock OpenAI response"
+        self.mock_openai_provider.request.return_value = ModelResponse(
+            "Mock OpenAI response", "openai", "gpt-4o-mini", 3, 4, 0.1
+        )
+        self.mock_openai_provider.fit_prompt.side_effect = (
+            lambda prompt, model, prompt_tokens: FittedPrompt(prompt, 3, 4096)
+        )
         
         # Provider configs for testing
         self.provider_configs = {
@@ -109,6 +121,93 @@ class TestPrompter(unittest.TestCase):
         with self.assertRaises(ValueError):
             prompter.send("Hello, world!", "unsupported-model")
     
+    def test_request_returns_response(self):
+        """Test request returns the provider response with usage."""
+        prompter = Prompter("gemini-2.0-flash", self.provider_configs)
+        response = prompter.request("Hello, world!")
+
+        self.assertIsInstance(response, ModelResponse)
+        self.assertEqual(response.text, "Mock Gemini response")
+        self.assertEqual(response.provider, "gemini")
+        self.assertEqual(response.output_tokens, 4)
+
+    def test_request_batch(self):
+        """Test request_batch collects every response."""
+        prompter = Prompter("gemini-2.0-flash", self.provider_configs)
+        collector = prompter.request_batch(["First", "Second"], "gpt-4o-mini")
+
+        self.assertIsInstance(collector, ResponseCollector)
+        self.assertEqual(len(collector), 2)
+        self.assertEqual(collector.text(1), "Mock OpenAI response")
+        self.assertEqual(collector.total_tokens(), (6, 8))
+        self.assertEqual(self.mock_openai_provider.request.call_count, 2)
+
+    def test_request_batch_records_failures(self):
+        """Test a failing prompt is recorded without losing the rest of the batch."""
+        response = self.mock_openai_provider.request.return_value
+        self.mock_openai_provider.request.side_effect = [
+            response, ValueError("Upstream error"), response
+        ]
+        prompter = Prompter("gemini-2.0-flash", self.provider_configs)
+
+        collector = prompter.request_batch(["First", "Second", "Third"], "gpt-4o-mini")
+
+        self.assertEqual(len(collector), 3)
+        self.assertEqual(collector.failed_indexes(), [1])
+        self.assertEqual(collector.error(1), "ValueError: Upstream error")
+        self.assertEqual(collector.text(2), "Mock OpenAI response")
+
+    def test_request_batch_unsupported_model(self):
+        """Test request_batch raises before sending when no provider has the model."""
+        prompter = Prompter("gemini-2.0-flash", self.provider_configs)
+        with self.assertRaises(ValueError):
+            prompter.request_batch(["First"], "unsupported-model")
+
+    def test_send_fits_prompt_before_request(self):
+        """Test send passes the fitted prompt on to the provider."""
+        self.mock_gemini_provider.fit_prompt.side_effect = (
+            lambda prompt, model, prompt_tokens: FittedPrompt(prompt[:5], 2, 4096)
+        )
+        prompter = Prompter("gemini-2.0-flash", self.provider_configs)
+        prompter.send("Hello, world!")
+
+        self.mock_gemini_provider.fit_prompt.assert_called_once_with("Hello, world!", "gemini-2.0-flash", None)
+        self.mock_gemini_provider.request.assert_called_once_with("Hello", "gemini-2.0-flash")
+
+    def test_send_rejects_oversized_prompt(self):
+        """Test send does not make a request when the prompt does not fit."""
+        self.mock_gemini_provider.fit_prompt.side_effect = ValueError("Prompt too large")
+        prompter = Prompter("gemini-2.0-flash", self.provider_configs)
+        with self.assertRaises(ValueError):
+            prompter.send("Hello, world!")
+        self.mock_gemini_provider.request.assert_not_called()
+
+    def test_send_passes_known_prompt_tokens(self):
+        """Test a known prompt size is passed on instead of being recounted."""
+        prompter = Prompter("gemini-2.0-flash", self.provider_configs)
+        prompter.send("Hello, world!", prompt_tokens=3)
+
+        self.mock_gemini_provider.fit_prompt.assert_called_once_with("Hello, world!", "gemini-2.0-flash", 3)
+
+    def test_fit_prompt(self):
+        """Test fit_prompt checks the prompt with the provider serving the model."""
+        self.mock_openai_provider.fit_prompt.side_effect = None
+        self.mock_openai_provider.fit_prompt.return_value = FittedPrompt("Hello", 2, 4096)
+        prompter = Prompter("gemini-2.0-flash", self.provider_configs)
+
+        fitted = prompter.fit_prompt("Hello, world!", "gpt-4o-mini")
+
+        self.assertEqual(fitted.total_tokens, 4098)
+        self.mock_openai_provider.fit_prompt.assert_called_once_with("Hello, world!", "gpt-4o-mini")
+        self.mock_openai_provider.request.assert_not_called()
+
+    def test_count_tokens(self):
+        """Test count_tokens uses the provider serving the model."""
+        self.mock_openai_provider.count_tokens.return_value = 3
+        prompter = Prompter("gemini-2.0-flash", self.provider_configs)
+        self.assertEqual(prompter.count_tokens("Hello, world!", "gpt-4o-mini"), 3)
+        self.mock_openai_provider.count_tokens.assert_called_once_with("Hello, world!", "gpt-4o-mini")
+
     def test_set_default_model(self):
         """Test setting a new default model."""
         prompter = Prompter("gemini-2.0-flash", self.provider_configs)
@@ -0,0 +1,124 @@
+import io
+import unittest
+from model_hub.response import ModelResponse, ResponseCollector
+
+class TestModelResponse(unittest.TestCase):
+    def test_slots(self):
+        """Test ModelResponse has no per-instance dict."""
+        response = ModelResponse("Hello", "openai", "gpt-4o-mini")
+        self.assertFalse(hasattr(response, "__dict__"))
+        with self.assertRaises(AttributeError):
+            response.extra = "value"
+
+    def test_default_values(self):
+        """Test usage and latency default when not reported."""
+        response = ModelResponse("Hello", "openai", "gpt-4o-mini")
+        self.assertIsNone(response.input_tokens)
+        self.assertIsNone(response.output_tokens)
+        self.assertEqual(response.latency, 0.0)
+
+class TestResponseCollector(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures."""
+        self.responses = [
+            ModelResponse("Hello", "openai", "gpt-4o-mini", 3, 1, 0.25),
+            ModelResponse("", "gemini", "gemini-2.0-flash", None, None, 0.5),
+            ModelResponse("你好, world", "openai", "gpt-4o-mini", 5, 4, 1.0),
+        ]
+        self.collector = ResponseCollector()
+        self.collector.extend(self.responses)
+
+    def test_round_trip(self):
+        """Test stored responses are returned unchanged."""
+        self.assertEqual(len(self.collector), 3)
+        self.assertEqual(list(self.collector), self.responses)
+        self.assertEqual(self.collector[-1], self.responses[2])
+
+    def test_text(self):
+        """Test text is read back from the shared buffer."""
+        self.assertEqual(self.collector.text(0), "Hello")
+        self.assertEqual(self.collector.text(1), "")
+        self.assertEqual(bytes(self.collector.text_view(2)), "你好, world".encode())
+
+    def test_index_out_of_range(self):
+        """Test out of range indexes raise IndexError."""
+        with self.assertRaises(IndexError):
+            self.collector[3]
+        with self.assertRaises(IndexError):
+            self.collector.text(-4)
+
+    def test_total_tokens(self):
+        """Test token totals skip missing counts."""
+        self.assertEqual(self.collector.total_tokens(), (8, 5))
+
+    def test_write_and_read(self):
+        """Test responses survive a write and read."""
+        file = io.BytesIO()
+        self.collector.write(file)
+        file.seek(0)
+
+        collector = ResponseCollector.read(file)
+        self.assertEqual(list(collector), self.responses)
+
+        collector.append(ModelResponse("More", "gemini", "gemini-2.0-flash"))
+        self.assertEqual(collector[3].provider, "gemini")
+
+    def test_errors(self):
+        """Test failed requests keep their row and error message."""
+        self.collector.append_error("openai", "gpt-4o-mini", "ValueError: Prompt too large")
+
+        self.assertEqual(len(self.collector), 4)
+        self.assertEqual(self.collector.text(3), "")
+        self.assertEqual(self.collector.error(3), "ValueError: Prompt too large")
+        self.assertIsNone(self.collector.error(0))
+        self.assertEqual(self.collector.failed_indexes(), [3])
+
+        file = io.BytesIO()
+        self.collector.write(file)
+        file.seek(0)
+        collector = ResponseCollector.read(file)
+        self.assertEqual(collector.failed_indexes(), [3])
+        self.assertEqual(collector.error(3), "ValueError: Prompt too large")
+
+    def test_read_truncated_file(self):
+        """Test a file missing its last bytes is rejected."""
+        file = io.BytesIO()
+        self.collector.write(file)
+        data = file.getvalue()
+
+        for size in (len(data) - 5, len(data) - 30, len(data) // 2):
+            with self.assertRaises(ValueError):
+                ResponseCollector.read(io.BytesIO(data[:size]))
+
+    def test_read_inconsistent_header(self):
+        """Test a header whose count does not match the columns is rejected."""
+        file = io.BytesIO()
+        self.collector.write(file)
+        data = file.getvalue().replace(b'"count": 3', b'"count": 2', 1)
+
+        with self.assertRaises(ValueError):
+            ResponseCollector.read(io.BytesIO(data))
+
+    def test_read_missing_byteorder(self):
+        """Test a header without a byte order is rejected with a ValueError."""
+        file = io.BytesIO()
+        self.collector.write(file)
+        data = file.getvalue().replace(b'"byteorder"', b'"unknown"', 1)
+
+        with self.assertRaises(ValueError):
+            ResponseCollector.read(io.BytesIO(data))
+
+    def test_read_empty_collector(self):
+        """Test an empty collector survives a write and read."""
+        file = io.BytesIO()
+        ResponseCollector().write(file)
+        file.seek(0)
+        self.assertEqual(len(ResponseCollector.read(file)), 0)
+
+    def test_read_invalid_file(self):
+        """Test reading a file not written by a collector raises."""
+        with self.assertRaises(ValueError):
+            ResponseCollector.read(io.BytesIO(b"not a collector file"))
+
+if __name__ == "__main__":
+    unittest.main()
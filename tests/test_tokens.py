@@ -0,0 +1,185 @@
+import unittest
+from typing import List, Sequence
+from unittest.mock import patch
+from model_hub.config import ModelConfig
+from model_hub.models.model_abc import ModelName, ModelProviderABC
+from model_hub.response import ModelResponse
+from model_hub.tokens import estimate_tokens, get_context_window, truncate_to_tokens
+
+class StubProvider(ModelProviderABC):
+    def get_name(self) -> ModelName:
+        return ModelName.OPENAI
+
+    def request(self, prompt: str, model: str) -> ModelResponse:
+        return ModelResponse(prompt, self.get_name().value, model)
+
+    def get_all_models(self) -> List[str]:
+        return self._config.supported_models
+
+    def get_supported_models(self) -> List[str]:
+        return self._config.supported_models
+
+class CharTokenizer:
+    """Exact tokenizer stand-in with one token per character."""
+    def encode(self, text: str) -> List[int]:
+        return [ord(char) for char in text]
+
+    def decode(self, tokens: Sequence[int]) -> str:
+        return "".join(chr(token) for token in tokens)
+
+class TestTokens(unittest.TestCase):
+    def test_get_context_window(self):
+        """Test context windows resolve by longest model family prefix."""
+        self.assertEqual(get_context_window("gpt-4o-mini"), 128000)
+        self.assertEqual(get_context_window("gpt-4"), 8192)
+        self.assertEqual(get_context_window("gpt-4-turbo-preview"), 128000)
+        self.assertEqual(get_context_window("gemini-2.0-flash"), 1048576)
+        self.assertIsNone(get_context_window("unknown-model"))
+
+    def test_get_context_window_variants(self):
+        """Test dated and preview variants do not inherit a family's window."""
+        self.assertEqual(get_context_window("gpt-4-0613"), 8192)
+        self.assertEqual(get_context_window("gpt-4.5-preview"), 128000)
+        self.assertEqual(get_context_window("gpt-4-0125-preview"), 128000)
+        self.assertEqual(get_context_window("gpt-4-1106-preview"), 128000)
+        self.assertEqual(get_context_window("gpt-3.5-turbo-instruct"), 4096)
+        self.assertEqual(get_context_window("o1-2024-12-17"), 200000)
+        self.assertIsNone(get_context_window("gpt-4-unknown-variant"))
+        self.assertIsNone(get_context_window("o10"))
+
+    def test_estimate_tokens(self):
+        """Test the heuristic gives sensible counts."""
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertEqual(estimate_tokens("Hello, world!"), 4)
+        self.assertEqual(estimate_tokens("你好"), 2)
+        long_text = "The quick brown fox jumps over the lazy dog. " * 100
+        self.assertAlmostEqual(estimate_tokens(long_text), 1000, delta=200)
+
+    def test_estimate_accented_latin(self):
+        """Test accented words are counted as words, not a token per character."""
+        self.assertEqual(estimate_tokens("était"), 1)
+        french = "L'été dernier, nous étions à la plage près de Nîmes avec des amis. " * 50
+        chars_per_token = len(french) / estimate_tokens(french)
+        self.assertGreater(chars_per_token, 3)
+
+    def test_estimate_cjk(self):
+        """Test CJK text is counted a token per character."""
+        self.assertEqual(estimate_tokens("你好世界"), 4)
+        self.assertEqual(estimate_tokens("こんにちは"), 5)
+        self.assertEqual(estimate_tokens("안녕하세요"), 5)
+
+    def test_estimate_with_tokenizer(self):
+        """Test a configured tokenizer gives exact counts."""
+        self.assertEqual(estimate_tokens("Hello, world!", CharTokenizer()), 13)
+        self.assertEqual(truncate_to_tokens("Hello, world!", 5, CharTokenizer()), "Hello")
+
+    def test_truncate_inside_long_piece(self):
+        """Test a single piece larger than the budget is cut rather than dropped."""
+        chinese = "你好世界" * 1000
+        truncated = truncate_to_tokens(chinese, 100)
+        self.assertEqual(truncated, chinese[:100])
+
+        identifier = "a" * 5000
+        truncated = truncate_to_tokens("Value: " + identifier, 50)
+        self.assertTrue(truncated.startswith("Value: aaaa"))
+        self.assertLessEqual(estimate_tokens(truncated), 50)
+        self.assertGreater(estimate_tokens(truncated), 45)
+
+    def test_truncate_to_tokens(self):
+        """Test truncation keeps a prefix within the token budget."""
+        text = "The quick brown fox jumps over the lazy dog. " * 100
+        truncated = truncate_to_tokens(text, 50)
+
+        self.assertTrue(text.startswith(truncated))
+        self.assertLessEqual(estimate_tokens(truncated), 50)
+        self.assertGreater(estimate_tokens(truncated), 40)
+        self.assertEqual(truncate_to_tokens("Hello", 50), "Hello")
+        self.assertEqual(truncate_to_tokens("Hello", 0), "")
+
+class TestFitPrompt(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures."""
+        self.prompt = "The quick brown fox jumps over the lazy dog. " * 100
+
+    def test_prompt_within_window(self):
+        """Test prompts that fit are returned unchanged."""
+        provider = StubProvider(ModelConfig(max_response_tokens=100, context_window=2000))
+        fitted = provider.fit_prompt(self.prompt, "gpt-4o-mini")
+
+        self.assertEqual(fitted.prompt, self.prompt)
+        self.assertEqual(fitted.prompt_tokens, estimate_tokens(self.prompt))
+        self.assertEqual(fitted.total_tokens, fitted.prompt_tokens + 100)
+
+    def test_known_prompt_tokens_are_not_recounted(self):
+        """Test a known prompt size skips counting."""
+        provider = StubProvider(ModelConfig(max_response_tokens=100, context_window=2000))
+        with patch.object(provider, "count_tokens") as mock_count_tokens:
+            fitted = provider.fit_prompt(self.prompt, "gpt-4o-mini", prompt_tokens=7)
+        mock_count_tokens.assert_not_called()
+        self.assertEqual(fitted.prompt_tokens, 7)
+
+    def test_unknown_window(self):
+        """Test prompts for models without a known window are not checked."""
+        provider = StubProvider(ModelConfig())
+        self.assertEqual(provider.fit_prompt(self.prompt, "unknown-model").prompt, self.prompt)
+
+    def test_prompt_overflow_raises(self):
+        """Test oversized prompts raise before any request is made."""
+        provider = StubProvider(ModelConfig(max_response_tokens=100, context_window=500))
+        with self.assertRaises(ValueError):
+            provider.fit_prompt(self.prompt, "gpt-4o-mini")
+
+    def test_response_tokens_count_against_window(self):
+        """Test max_response_tokens alone can overflow the window."""
+        provider = StubProvider(ModelConfig(max_response_tokens=8192, truncate_prompt=True))
+        with self.assertRaises(ValueError):
+            provider.fit_prompt("Hello", "gpt-4")
+        self.assertEqual(provider.fit_prompt("Hello", "gpt-4o-mini").prompt, "Hello")
+
+    def test_estimate_margin(self):
+        """Test heuristic estimates slightly over budget are let through."""
+        provider = StubProvider(ModelConfig(max_response_tokens=100, context_window=500))
+        prompt = "word " * 440
+        self.assertEqual(provider.fit_prompt(prompt, "gpt-4o-mini").prompt, prompt)
+
+    def test_exact_tokenizer_has_no_margin(self):
+        """Test exact counts are held to the budget."""
+        provider = StubProvider(
+            ModelConfig(max_response_tokens=100, context_window=500, tokenizer=CharTokenizer())
+        )
+        self.assertEqual(provider.fit_prompt("a" * 400, "gpt-4o-mini").prompt_tokens, 400)
+        with self.assertRaises(ValueError):
+            provider.fit_prompt("a" * 401, "gpt-4o-mini")
+
+    def test_truncates_long_chinese_prompt(self):
+        """Test a prompt with no spaces is truncated instead of emptied."""
+        provider = StubProvider(
+            ModelConfig(max_response_tokens=100, context_window=500, truncate_prompt=True)
+        )
+        fitted = provider.fit_prompt("你好世界" * 1000, "gpt-4o-mini")
+
+        self.assertEqual(len(fitted.prompt), 400)
+        self.assertEqual(fitted.prompt_tokens, 400)
+
+    def test_empty_truncation_raises(self):
+        """Test a prompt that would be truncated to nothing is rejected."""
+        provider = StubProvider(
+            ModelConfig(max_response_tokens=100, context_window=500, truncate_prompt=True)
+        )
+        with patch('model_hub.models.model_abc.truncate_to_tokens', return_value=""):
+            with self.assertRaises(ValueError):
+                provider.fit_prompt("你好世界" * 1000, "gpt-4o-mini")
+
+    def test_prompt_overflow_truncates(self):
+        """Test oversized prompts are truncated when truncate_prompt is set."""
+        provider = StubProvider(
+            ModelConfig(max_response_tokens=100, context_window=500, truncate_prompt=True)
+        )
+        fitted = provider.fit_prompt(self.prompt, "gpt-4o-mini")
+
+        self.assertTrue(self.prompt.startswith(fitted.prompt))
+        self.assertLessEqual(fitted.prompt_tokens, 400)
+        self.assertEqual(fitted.prompt_tokens, provider.count_tokens(fitted.prompt, "gpt-4o-mini"))
+
+if __name__ == "__main__":
+    unittest.main()